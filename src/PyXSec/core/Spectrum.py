@@ -1,30 +1,103 @@
-import xml.etree.ElementTree as et
+try:
+    from lxml import etree as et
+except ImportError:
+    import xml.etree.ElementTree as et
 import sys
-import math
+import os
+import functools
+import concurrent.futures
+import multiprocessing as mp
 import tqdm
 import ROOT
+import numpy as np
 from core.Unfolder import Unfolder
 from utils import (
     get_custom_logger,
+    try_parse_str,
     try_parse_int,
     try_parse_float,
-    try_parse_str,
     transpose_matrix,
     divide_by_bin_width,
-    run_toy,
+    sample_toys,
+    compute_covariance,
+    match_bins,
+    get_contents_view,
+    get_sumw2_view,
+    copy_bins,
+    get_bin_edges,
 )
 
 # Logger settings
 log = get_custom_logger(__name__)
 
-# Load RooUnfold
-loaded_RooUnfold = ROOT.gSystem.Load("HEP_deps/RooUnfold/libRooUnfold.so")
-if not loaded_RooUnfold == 0:
-    log.error("RooUnfold not found!")
-    sys.exit(0)
+@functools.lru_cache(maxsize=32)
+def _load_config(path, mtime):
+    """
+    Parse an XML configuration file, once per file modification.
+    The modification time is part of the cache key, so that edited files are parsed again.
+
+    Args:
+        path (str): path of the configuration file.
+        mtime (float): modification time of the configuration file.
+
+    Returns:
+        Element: the root of the parsed configuration, to be only read.
+    """
+
+    return et.parse(path).getroot()
+
+
+# Input files opened so far, shared by all the spectra
+_input_files = {}
+
+
+def _open_input_file(path):
+    """
+    Open an input ROOT file, reusing it if it has already been opened.
+    Remote files are read through a read-ahead cache to coalesce the network requests.
+
+    Args:
+        path (str): path of the file.
+
+    Returns:
+        ROOT.TFile: the opened file.
+    """
+
+    f = _input_files.get(path)
+    if f is None or not f.IsOpen():
+        f = ROOT.TFile.Open(path)
+        if not f or f.IsZombie():
+            log.error("Cannot open input file: {}".format(path))
+            sys.exit(0)
+        if "://" in path:
+            # The cache is managed by the file from now on, not by Python
+            cache = ROOT.TFileCacheRead(f, 10 * 1024 * 1024)
+            ROOT.SetOwnership(cache, False)
+            f.SetCacheRead(cache)
+        _input_files[path] = f
+
+    return f
+
+
+# Spectrum whose toys are run by forked worker processes, see Spectrum._run_toys_parallel()
+_forked_spectrum = None
+
+
+def _run_toys_worker(ntoys, seed):
+    """
+    Run a chunk of pseudo-experiments in a forked worker process.
+
+    Args:
+        ntoys (int): number of toys to run.
+        seed (int): seed for the random number generators.
+
+    Returns:
+        dict: the results of the chunk, see Spectrum._run_toys_chunk().
+    """
 
-# Hide legend
-ROOT.gStyle.SetOptStat(0)
+    return _forked_spectrum._run_toys_chunk(
+        _forked_spectrum, ntoys, seed, show_progress=False
+    )
 
 
 class Spectrum:
@@ -32,6 +105,95 @@ class Spectrum:
     Class used to construct a spectrum object to unfold input data.
     """
 
+    # Instance attributes, see __init__()
+    __slots__ = (
+        # Input variables
+        "config",
+        "syst_name",
+        "output",
+        # Bool variables
+        "ignore_background",
+        "transpose_response",
+        "is_initialized",
+        # String variables
+        "input_sig_path",
+        "input_data_path",
+        "input_res_path",
+        "input_gen_path",
+        "method",
+        "input_bkg_path",
+        "input_bkg_histo",
+        "histo_reco_path",
+        "histo_data_path",
+        "histo_res_path",
+        "histo_gen_path",
+        "staterr",
+        "m_staterr_mode",
+        "m_toy_type",
+        # Numeric variables
+        "reco_scale_factor",
+        "unfolding_parameter",
+        "br",
+        "do_efficiency_correction",
+        "do_total_cross_section",
+        "lumi",
+        "nToys",
+        "njobs",
+        "m_nbins",
+        "m_bins",
+        "m_totalXs",
+        "m_totalXs_stat_err",
+        # Histograms
+        "h_data",
+        "h_signal_reco",
+        "h_signal_truth",
+        "h_response",
+        "h_generated",
+        "h_background",
+        "h_data_minus_bkg",
+        "h_efficiency",
+        "h_acceptance",
+        "h_data_unfolded",
+        "h_absXs",
+        "h_relXs",
+        "h_absXs_covariance",
+        "h_absXs_correlation",
+        "h_relXs_covariance",
+        "h_relXs_correlation",
+        "h_absXs_variance",
+        "h_relXs_variance",
+        # Other
+        "m_output",
+        "unfolder",
+        "v_toys_abs",
+        "v_toys_rel",
+        "m_sx_abs",
+        "m_sx_rel",
+    )
+
+    # Configuration fields, as (attribute, XML tag, XML attribute, parser)
+    _FIELDS = [
+        ("br", "br", "value", try_parse_float),
+        ("lumi", "lumi", "value", try_parse_float),
+        ("input_sig_path", "sig", "file", try_parse_str),
+        ("input_data_path", "data", "file", try_parse_str),
+        ("input_res_path", "res", "file", try_parse_str),
+        ("input_gen_path", "gen", "file", try_parse_str),
+        ("input_bkg_path", "bkg", "file", try_parse_str),
+        ("input_bkg_histo", "bkg", "hpath", try_parse_str),
+        ("histo_reco_path", "sig", "hpath", try_parse_str),
+        ("histo_data_path", "data", "hpath", try_parse_str),
+        ("histo_res_path", "res", "hpath", try_parse_str),
+        ("histo_gen_path", "gen", "hpath", try_parse_str),
+        ("method", "unfolding", "method", try_parse_str),
+        ("nToys", "unfolding", "ntoys", try_parse_int),
+        ("njobs", "unfolding", "njobs", try_parse_int),
+        ("staterr", "unfolding", "statErr", try_parse_str),
+        ("do_total_cross_section", "do_total", "value", try_parse_int),
+        ("reco_scale_factor", "reco_scale", "value", try_parse_float),
+        ("do_efficiency_correction", "do_eff", "value", try_parse_int),
+    ]
+
     def __init__(self, config, systematic, output):
         """
         Constructor of the Spectrum class. Parse input data and create histograms.
@@ -65,6 +227,7 @@ class Spectrum:
         self.histo_res_path = ""
         self.histo_gen_path = ""
         self.staterr = ""
+        self.m_staterr_mode = ""
         self.m_toy_type = ""
 
         # Numeric variables
@@ -75,6 +238,7 @@ class Spectrum:
         self.do_total_cross_section = 0
         self.lumi = 0.0
         self.nToys = 10000
+        self.njobs = 1
         self.m_nbins = 0
         self.m_bins = None
         self.m_totalXs = 0.0
@@ -99,15 +263,10 @@ class Spectrum:
         self.h_relXs_correlation = ROOT.TH1D()
         self.h_absXs_variance = ROOT.TH1D()
         self.h_relXs_variance = ROOT.TH1D()
-        # self.h_abs_pull_fit_error = ROOT.TH1D()
-        # self.h_rel_pull_fit_error = ROOT.TH1D()
-        # self.h_abs_pull_fit_mean = ROOT.TH1D()
-        # self.h_rel_pull_fit_mean = ROOT.TH1D()
 
         # Other
         self.m_output = None
         self.unfolder = None
-        self.m_toy_tree = ROOT.TTree()
         self.v_toys_abs = []
         self.v_toys_rel = []
         self.m_sx_abs = []
@@ -124,23 +283,25 @@ class Spectrum:
         Parse all the information from input configuration file.
         """
 
-        # Initialize XML parser
-        tree = et.parse(self.config)
-        root = tree.getroot()
+        # Parse the configuration, each file is parsed once per modification
+        root = _load_config(self.config, os.path.getmtime(self.config))
 
-        # Read basic quantities from config
-        self.br = try_parse_float(self.br, root, "br", "value")
-        self.lumi = try_parse_float(self.lumi, root, "lumi", "value")
+        # Read the configuration fields, keeping the defaults of missing or invalid ones
+        for name, tag, key, parse in self._FIELDS:
+            setattr(self, name, parse(getattr(self, name), root, tag, key))
 
-        # Read file paths
-        self.input_sig_path = try_parse_str(self.input_sig_path, root, "sig", "file")
-        self.input_data_path = try_parse_str(self.input_data_path, root, "data", "file")
-        self.input_res_path = try_parse_str(self.input_res_path, root, "res", "file")
-        self.input_gen_path = try_parse_str(self.input_gen_path, root, "gen", "file")
+        # Prefetch the remote input files asynchronously
+        input_paths = [
+            self.input_sig_path,
+            self.input_data_path,
+            self.input_res_path,
+            self.input_gen_path,
+            self.input_bkg_path,
+        ]
+        if any("://" in path for path in input_paths):
+            ROOT.gEnv.SetValue("TFile.AsyncPrefetching", 1)
 
-        # Read background information
-        self.input_bkg_path = try_parse_str(self.input_bkg_path, root, "bkg", "file")
-        self.input_bkg_histo = try_parse_str(self.input_bkg_histo, root, "bkg", "hpath")
+        # Check background information
         if self.input_bkg_path == "" or self.input_bkg_histo == "":
             log.warning(
                 "Background path or histogram is empty, we will not subtract the background"
@@ -149,16 +310,7 @@ class Spectrum:
         else:
             log.info("Background path: {}".format(self.input_bkg_path))
 
-        # Read histogram paths
-        self.histo_reco_path = try_parse_str(self.histo_reco_path, root, "sig", "hpath")
-        self.histo_data_path = try_parse_str(
-            self.histo_data_path, root, "data", "hpath"
-        )
-        self.histo_res_path = try_parse_str(self.histo_res_path, root, "res", "hpath")
-        self.histo_gen_path = try_parse_str(self.histo_gen_path, root, "gen", "hpath")
-
-        # Read unfolding information
-        self.method = try_parse_str(self.method, root, "unfolding", "method")
+        # Read unfolding parameters depending on the method
         self.unfolding_parameter = try_parse_int(
             self.unfolding_parameter, root, "unfolding", "regularization"
         )
@@ -166,19 +318,26 @@ class Spectrum:
             self.unfolding_parameter = try_parse_float(
                 self.unfolding_parameter, root, "unfolding", "regularization"
             )
-        self.nToys = try_parse_int(self.nToys, root, "unfolding", "ntoys")
-        self.staterr = try_parse_str(self.staterr, root, "unfolding", "statErr")
-
-        # Read other parameters
-        self.do_total_cross_section = try_parse_int(
-            self.do_total_cross_section, root, "do_total", "value"
-        )
-        self.reco_scale_factor = try_parse_float(
-            self.reco_scale_factor, root, "reco_scale", "value"
-        )
-        self.do_efficiency_correction = try_parse_int(
-            self.do_efficiency_correction, root, "do_eff", "value"
-        )
+        if self.njobs < 1:
+            self.njobs = os.cpu_count()
+
+        # Parse the statistical error treatment: "analytical", "toys" or "toys:<toy type>"
+        staterr = self.staterr.split(":")
+        self.m_staterr_mode = staterr[0]
+        if (
+            self.m_staterr_mode not in ["", "analytical", "toys"]
+            or len(staterr) > 2
+            or (len(staterr) == 2 and self.m_staterr_mode != "toys")
+        ):
+            log.error("Unknown statistical error treatment: {}".format(self.staterr))
+            sys.exit(0)
+        if len(staterr) == 2:
+            self.m_toy_type = staterr[1]
+        elif self.m_staterr_mode == "toys":
+            if self.syst_name != "MCstat":
+                self.m_toy_type = "Poisson"
+            else:
+                self.m_toy_type = "Gauss"
 
         # Print unfolding information
         log.info(
@@ -207,21 +366,9 @@ class Spectrum:
                 self.input_data_path
             )
         )
-        f_temp = ROOT.TFile.Open(self.input_data_path)
-        h_temp = None
-        f_temp.cd()
-        h_temp = ROOT.gDirectory.Get(self.histo_data_path)
-        if self.do_total_cross_section == 0:
-            self.h_data = h_temp.Clone()
-        else:
-            self.h_data = ROOT.TH1D("h_data", "data", 1, 0, 1)
-            integral, error = 0, 0
-            integral = h_temp.IntegralAndError(1, h_temp.GetNbinsX(), error)
-            self.h_data.SetBinContent(1, integral)
-            self.h_data.SetBinError(1, error)
-        self.h_data.SetDirectory(0)
-        f_temp.Close()
-        self.h_data.ClearUnderflowAndOverflow()
+        self.h_data = self._load_histogram(
+            self, self.input_data_path, self.histo_data_path, "h_data", "data"
+        )
         self.h_data.Scale(self.reco_scale_factor)
         log.info(
             "Rescaling the data by \x1b[38;5;171m{}\x1b[0m".format(
@@ -236,19 +383,13 @@ class Spectrum:
                 self.input_sig_path
             )
         )
-        f_temp = ROOT.TFile.Open(self.input_sig_path)
-        f_temp.cd()
-        h_temp = ROOT.gDirectory.Get(self.histo_reco_path)
-        if self.do_total_cross_section == 0:
-            self.h_signal_reco = h_temp.Clone()
-        else:
-            self.h_signal_reco = ROOT.TH1D("h_signalReco", "signalReco", 1, 0, 1)
-            integral, error = 0, 0
-            integral = h_temp.IntegralAndError(1, h_temp.GetNbinsX(), error)
-            self.h_signal_reco.SetBinContent(1, integral)
-            self.h_signal_reco.SetBinError(1, error)
-        self.h_signal_reco.ClearUnderflowAndOverflow()
-        self.h_signal_reco.SetDirectory(0)
+        self.h_signal_reco = self._load_histogram(
+            self,
+            self.input_sig_path,
+            self.histo_reco_path,
+            "h_signalReco",
+            "signalReco",
+        )
 
         # Load response matrix
         log.info(
@@ -256,46 +397,7 @@ class Spectrum:
                 self.input_res_path
             )
         )
-        f_temp = ROOT.TFile.Open(self.input_res_path)
-        f_temp.cd()
-        h_response_temp = ROOT.gDirectory.Get(self.histo_res_path)
-
-        if self.do_total_cross_section == 0:
-            label = h_response_temp.GetXaxis().GetBinLabel(1)
-            if label == "":  # this means that we are doing a 2D unfolding
-                binningX = h_response_temp.GetXaxis().GetXbins().GetArray()
-                binningY = h_response_temp.GetYaxis().GetXbins().GetArray()
-                self.h_response = ROOT.TH2D(
-                    "response_tmp",
-                    "response_tmp",
-                    h_response_temp.GetNbinsX(),
-                    binningX,
-                    h_response_temp.GetNbinsY(),
-                    binningY,
-                )
-                for i in range(1, h_response_temp.GetNbinsY() + 1):
-                    for j in range(1, h_response_temp.GetNbinsX() + 1):
-                        self.h_response.SetBinContent(
-                            j, i, h_response_temp.GetBinContent(j, i)
-                        )
-                        self.h_response.SetBinError(
-                            j, i, h_response_temp.GetBinError(j, i)
-                        )
-            else:
-                self.h_response = h_response_temp.Clone()
-        else:
-            self.h_response = ROOT.TH2D("response", "response", 1, 0, 1, 1, 0, 1)
-            integral, error = 0, 0
-            integral = h_response_temp.IntegralAndError(
-                1, h_response_temp.GetNbinsX(), 1, h_response_temp.GetNbinsY(), error
-            )
-            self.h_response.SetBinContent(1, 1, integral)
-            self.h_response.SetBinError(1, 1, error)
-        self.h_response.ClearUnderflowAndOverflow()
-        if self.transpose_response == True:
-            transpose_matrix(self.h_response)
-        self.h_response.SetDirectory(0)
-        f_temp.Close()
+        self.h_response = self._load_response(self)
 
         # Loading generated histogram
         if self.do_efficiency_correction == 1:
@@ -304,51 +406,104 @@ class Spectrum:
                     self.input_sig_path
                 )
             )
-            f_temp = ROOT.TFile.Open(self.input_gen_path)
-            f_temp.cd()
-            h_temp = f_temp.Get(self.histo_gen_path)
-            if self.do_total_cross_section == 0:
-                self.h_generated = h_temp.Clone()
-            else:
-                self.h_generated = ROOT.TH1D("generated", "generated", 1, 0, 1)
-                integral, error = 0, 0
-                integral = h_temp.IntegralAndError(1, h_temp.GetNbinsX(), error)
-                self.h_generated.SetBinContent(1, integral)
-                self.h_generated.SetBinError(1, error)
-            self.h_generated.SetDirectory(0)
-            f_temp.Close()
+            self.h_generated = self._load_histogram(
+                self,
+                self.input_gen_path,
+                self.histo_gen_path,
+                "generated",
+                "generated",
+            )
         else:
             self.h_generated = self.h_response.ProjectionY()
         self.h_generated.Scale(1.0 / self.br)
-        f_temp = 0
         self.m_nbins = self.h_generated.GetNbinsX()
         self.h_generated.ClearUnderflowAndOverflow()
-        self.m_bins = [
-            self.h_generated.GetXaxis().GetXbins().At(i)
-            for i in range(self.m_nbins + 1)
-        ]
+        self.m_bins = get_bin_edges(self.h_generated.GetXaxis())
 
         # Loading background histogram
         if self.ignore_background == False:
             log.info("Loading background file {0}".format(self.input_bkg_path))
-            f_temp = ROOT.TFile.Open(self.input_bkg_path)
-            f_temp.cd()
-            h_temp = f_temp.Get(self.histo_reco_path)
-            if self.do_total_cross_section == 0:
-                self.h_background = h_temp.Clone()
+            self.h_background = self._load_histogram(
+                self,
+                self.input_bkg_path,
+                self.histo_reco_path,
+                "h_allBkg",
+                "h_allBkg",
+            )
+        else:
+            self.h_background = None
+
+        # Opening the input files changes the current directory, go back to the in-memory one
+        ROOT.gROOT.cd()
+
+    @staticmethod
+    def _load_histogram(self, path, hpath, name, title):
+        """
+        Load a histogram from an input file. For the total cross-section its bins are merged into a single one.
+
+        Args:
+            path (str): path of the input file.
+            hpath (str): path of the histogram inside the file.
+            name (str): name of the single-bin histogram.
+            title (str): title of the single-bin histogram.
+
+        Returns:
+            ROOT.TH1: the loaded histogram, detached from the file.
+        """
+
+        h_temp = _open_input_file(path).Get(hpath)
+        if self.do_total_cross_section == 0:
+            histo = h_temp.Clone()
+        else:
+            histo = h_temp.Rebin(h_temp.GetNbinsX(), name)
+            histo.SetTitle(title)
+            histo.GetXaxis().Set(1, 0, 1)
+        histo.ClearUnderflowAndOverflow()
+        histo.SetDirectory(0)
+
+        return histo
+
+    @staticmethod
+    def _load_response(self):
+        """
+        Load the response matrix from its input file. For the total cross-section its bins are merged into a single one.
+
+        Returns:
+            ROOT.TH2: the loaded response matrix, detached from the file.
+        """
+
+        f_temp = _open_input_file(self.input_res_path)
+        h_response_temp = f_temp.Get(self.histo_res_path)
+        if self.do_total_cross_section == 0:
+            label = h_response_temp.GetXaxis().GetBinLabel(1)
+            if label == "":  # this means that we are doing a 2D unfolding
+                binningX = get_bin_edges(h_response_temp.GetXaxis())
+                binningY = get_bin_edges(h_response_temp.GetYaxis())
+                h_response = ROOT.TH2D(
+                    "response_tmp",
+                    "response_tmp",
+                    h_response_temp.GetNbinsX(),
+                    binningX,
+                    h_response_temp.GetNbinsY(),
+                    binningY,
+                )
+                copy_bins(h_response_temp, h_response)
+                h_response.SetEntries(h_response_temp.GetEntries())
             else:
-                self.h_background = ROOT.TH1D("h_allBkg", "h_allBkg", 1, 0, 1)
-                integral, error = 0, 0
-                integral = h_temp.IntegralAndError(1, h_temp.GetNbinsX(), error)
-                self.h_background.SetBinContent(1, integral)
-                self.h_background.SetBinError(1, error)
-            self.h_background.ClearUnderflowAndOverflow()
-            self.h_background.SetDirectory(0)
-            f_temp.Close()
+                h_response = h_response_temp.Clone()
         else:
-            self.h_background = self.h_data.Clone()
-            self.h_background.Reset()
-            self.h_background.SetDirectory(0)
+            h_response = h_response_temp.Rebin2D(
+                h_response_temp.GetNbinsX(), h_response_temp.GetNbinsY(), "response"
+            )
+            h_response.SetTitle("response")
+            h_response.GetXaxis().Set(1, 0, 1)
+            h_response.GetYaxis().Set(1, 0, 1)
+        h_response.ClearUnderflowAndOverflow()
+        if self.transpose_response == True:
+            transpose_matrix(h_response)
+        h_response.SetDirectory(0)
+
+        return h_response
 
     @staticmethod
     def _initialize(self):
@@ -401,9 +556,10 @@ class Spectrum:
         self.h_response.SetName("Response")
 
         # Background histogram
-        self.h_background.SetStats(0)
-        self.h_background.SetDirectory(self.m_output)
-        self.h_background.SetName("Background")
+        if not self.ignore_background:
+            self.h_background.SetStats(0)
+            self.h_background.SetDirectory(self.m_output)
+            self.h_background.SetName("Background")
 
         # Generated histogram
         self.h_generated.SetStats(0)
@@ -418,20 +574,12 @@ class Spectrum:
             self.h_data_minus_bkg.Add(self.h_background, -1)
 
         # Initialize unfolder settings
-        staterr_arr = self.staterr.split(":")
-        if len(staterr_arr) == 1 and staterr_arr[0] == "analytical":
+        if self.m_staterr_mode == "analytical":
             self.unfolder = Unfolder(
                 self.method, "kCovToy", self.unfolding_parameter, self.nToys
             )
         else:
             self.unfolder = Unfolder(self.method, "kNoError", self.unfolding_parameter)
-            if len(staterr_arr) == 1 and staterr_arr[0] == "toys":
-                if self.syst_name != "MCstat":
-                    self.m_toy_type = "Poisson"
-                else:
-                    self.m_toy_type = "Gauss"
-            elif len(staterr_arr) == 2 and staterr_arr[0] == "toys":
-                self.m_toy_type = staterr_arr[1]
             log.info(
                 "Statistical uncertainty evaluated using {0} toys".format(
                     self.m_toy_type
@@ -467,61 +615,32 @@ class Spectrum:
         ]:
             histo.SetDirectory(0)
 
-        # Initialize matrices
-        for i in range(self.m_nbins):
-            for j in range(i + 1):
-                num_abs, den1_abs, den2_abs = 0.0, 0.0, 0.0
-                num_rel, den1_rel, den2_rel = 0.0, 0.0, 0.0
-
-                # Compute covariance with: cov(i,j) = 1/N * sum_n (data_i - mean_i) * (data_j - mean_j)
-                for itoy in range(self.nToys):
-                    num_abs += (
-                        (self.v_toys_abs[i][itoy] - self.m_sx_abs[i])
-                        * (self.v_toys_abs[j][itoy] - self.m_sx_abs[j])
-                        / self.nToys
-                    )
-                    num_rel += (
-                        (self.v_toys_rel[i][itoy] - self.m_sx_rel[i])
-                        * (self.v_toys_rel[j][itoy] - self.m_sx_rel[j])
-                        / self.nToys
-                    )
-                    den1_abs += (
-                        (self.v_toys_abs[i][itoy] - self.m_sx_abs[i])
-                        * (self.v_toys_abs[i][itoy] - self.m_sx_abs[i])
-                        / self.nToys
-                    )
-                    den2_abs += (
-                        (self.v_toys_abs[j][itoy] - self.m_sx_abs[j])
-                        * (self.v_toys_abs[j][itoy] - self.m_sx_abs[j])
-                        / self.nToys
-                    )
-                    den1_rel += (
-                        (self.v_toys_rel[i][itoy] - self.m_sx_rel[i])
-                        * (self.v_toys_rel[i][itoy] - self.m_sx_rel[i])
-                        / self.nToys
-                    )
-                    den2_rel += (
-                        (self.v_toys_rel[j][itoy] - self.m_sx_rel[j])
-                        * (self.v_toys_rel[j][itoy] - self.m_sx_rel[j])
-                        / self.nToys
-                    )
-
-                # Compute correlations
-                corr_abs = num_abs / math.sqrt(den1_abs * den2_abs)
-                self.h_absXs_covariance.SetBinContent(i + 1, j + 1, num_abs)
-                self.h_absXs_correlation.SetBinContent(i + 1, j + 1, corr_abs)
-                corr_rel = num_rel / math.sqrt(den1_rel * den2_rel)
-                self.h_relXs_covariance.SetBinContent(i + 1, j + 1, num_rel)
-                self.h_relXs_correlation.SetBinContent(i + 1, j + 1, corr_rel)
-
-                if i != j:
-                    self.h_absXs_covariance.SetBinContent(j + 1, i + 1, num_abs)
-                    self.h_absXs_correlation.SetBinContent(j + 1, i + 1, corr_abs)
-                    self.h_relXs_covariance.SetBinContent(j + 1, i + 1, num_rel)
-                    self.h_relXs_correlation.SetBinContent(j + 1, i + 1, corr_rel)
-                else:
-                    self.h_relXs_variance.SetBinContent(i + 1, num_rel)
-                    self.h_absXs_variance.SetBinContent(i + 1, num_abs)
+        # Compute matrices from the toys
+        self.m_sx_abs, cov_abs, corr_abs = compute_covariance(self.v_toys_abs)
+        self.m_sx_rel, cov_rel, corr_rel = compute_covariance(self.v_toys_rel)
+
+        # Fill histograms, the global bins of a TH2 are laid out as (y, x)
+        n = self.m_nbins
+        for histo, matrix in [
+            (self.h_absXs_covariance, cov_abs),
+            (self.h_absXs_correlation, corr_abs),
+            (self.h_relXs_covariance, cov_rel),
+            (self.h_relXs_correlation, corr_rel),
+        ]:
+            nx, ny = min(n, histo.GetNbinsX()), min(n, histo.GetNbinsY())
+            view = get_contents_view(histo).reshape(
+                histo.GetNbinsY() + 2, histo.GetNbinsX() + 2
+            )
+            view[1 : ny + 1, 1 : nx + 1] = matrix.T[:ny, :nx]
+            histo.SetEntries(nx * ny)
+        for histo, matrix in [
+            (self.h_absXs_variance, cov_abs),
+            (self.h_relXs_variance, cov_rel),
+        ]:
+            nx = min(n, histo.GetNbinsX())
+            get_contents_view(histo)[1 : nx + 1] = np.diag(matrix)[:nx]
+            histo.ResetStats()
+            histo.SetEntries(nx)
 
     @staticmethod
     def _run_toys_job(self):
@@ -533,301 +652,198 @@ class Spectrum:
         self.m_nbins = self.h_absXs.GetNbinsX()
         ROOT.gDirectory.cd()
         if self.nToys > 0:
-            # Variables
-            h_bin_toys_data = [ROOT.TH1D() for _ in range(self.m_nbins)]
-            h_bin_toys_unfold = [ROOT.TH1D() for _ in range(self.m_nbins)]
-            h_bin_toys_rel = [ROOT.TH1D() for _ in range(self.m_nbins)]
-            h_bin_toys_abs = [ROOT.TH1D() for _ in range(self.m_nbins)]
-            # h_bin_toys_rel_pull = [ROOT.TH1D() for _ in range(self.m_nbins)]
-            # h_bin_toys_abs_pull = [ROOT.TH1D() for _ in range(self.m_nbins)]
-            func_abs = [ROOT.TF1() for _ in range(self.m_nbins)]
-            func_rel = [ROOT.TF1() for _ in range(self.m_nbins)]
-            # func_abs_pull = [ROOT.TF1() for _ in range(self.m_nbins)]
-            # func_rel_pull = [ROOT.TF1() for _ in range(self.m_nbins)]
-
-            h_totalXs = ROOT.TH1D(
-                "totalXs", "totalXs", 100, 0.5 * self.m_totalXs, 1.5 * self.m_totalXs
-            )
-            h_data_smeared = ROOT.TH1D()
-            h_data_smeared_corrected = ROOT.TH1D()
-            h_bkg_smeared = ROOT.TH1D()
-            h_efficiency_smeared = ROOT.TH1D()
-            h_acceptance_smeared = ROOT.TH1D()
-            h_generated_smeared = ROOT.TH1D()
-            h_signal_reco_smeared = ROOT.TH1D()
-            h_signal_truth_smeared = ROOT.TH1D()
-            h_response_smeared = ROOT.TH2D()
-            h_relXs_smeared = ROOT.TH1D()
-            h_absXs_smeared = ROOT.TH1D()
-
-            integratedXs_smeared = 0
-
-            # Set-up pull histograms
-            ROOT.gDirectory.cd()  # TODO: check this
-            h_unfolded = self.unfolder.h_unfolded.Clone()
-            h_unfolded.SetDirectory(0)
-            # self.h_abs_pull_fit_mean = h_unfolded.Clone("PullTestMean_abs")
-            # self.h_abs_pull_fit_mean.Reset()
-            # self.h_abs_pull_fit_error = h_unfolded.Clone("PullTestError_abs")
-            # self.h_abs_pull_fit_error.Reset()
-            # self.h_rel_pull_fit_mean = h_unfolded.Clone("PullTestMean_rel")
-            # self.h_rel_pull_fit_mean.Reset()
-            # self.h_rel_pull_fit_error = h_unfolded.Clone("PullTestError_rel")
-            # self.h_rel_pull_fit_error.Reset()
-
-            # Allocate the histograms
-            for i in range(0, self.m_nbins):
-                # Compute error mean and relative error
-                error = self.h_data.GetBinError(i + 1)
-                rel_err = 4 * error / self.h_data_minus_bkg.GetBinContent(i + 1)
-
-                # Relative toy bin
-                mean = self.h_relXs.GetBinContent(i + 1)
-                h_bin_toys_rel[i] = ROOT.TH1D(
-                    f"Rel_toy_bin_{i}",
-                    f"Rel_toy_bin_{i}",
-                    100,
-                    (1 - 1.5 * rel_err) * mean,
-                    (1 + 1.5 * rel_err) * mean,
-                )
-                h_bin_toys_rel[i].SetDirectory(self.m_output)
-                # h_bin_toys_rel_pull[i] = ROOT.TH1D(
-                #     f"Rel_toyPull_bin_{i}", f"Rel_toyPull_bin_{i}", 100, -3, 3
-                # )
-                # h_bin_toys_rel_pull[i].SetDirectory(self.m_output)
-                func_rel[i] = ROOT.TF1(
-                    f"Gaus_rel_{i}",
-                    "gaus(0)",
-                    (1 - 1.5 * rel_err) * mean,
-                    (1 + 1.5 * rel_err) * mean,
-                )
-                # func_rel_pull[i] = ROOT.TF1(f"GausPull_rel_{i}", "gaus(0)", -3, 3)
-                # func_rel_pull[i].SetParameter(2, 1)
-
-                # Absolute toy bin
-                mean = self.h_absXs.GetBinContent(i + 1)
-                h_bin_toys_abs[i] = ROOT.TH1D(
-                    f"Abs_toy_bin_{i}",
-                    f"Abs_toy_bin_{i}",
-                    100,
-                    (1 - 1.5 * rel_err) * mean,
-                    (1 + 1.5 * rel_err) * mean,
-                )
-                h_bin_toys_abs[i].SetDirectory(self.m_output)
-
-                mean = self.h_data.GetBinContent(i + 1)
-                h_bin_toys_data[i] = ROOT.TH1D(
-                    f"Data_toy_bin_{i}",
-                    f"Data_toy_bin_{i}",
-                    100,
-                    (1 - 1.5 * rel_err) * mean,
-                    (1 + 1.5 * rel_err) * mean,
-                )
-                h_bin_toys_data[i].SetDirectory(self.m_output)
-
-                # h_bin_toys_abs_pull[i] = ROOT.TH1D(
-                #     f"Abs_toyPull_bin_{i}", f"Abs_toyPull_bin_{i}", 100, -3, 3
-                # )
-                # h_bin_toys_abs_pull[i].SetDirectory(self.m_output)
-
-                func_abs[i] = ROOT.TF1(
-                    f"Gaus_abs_{i}",
-                    "gaus(0)",
-                    (1 - 1.5 * rel_err) * mean,
-                    (1 + 1.5 * rel_err) * mean,
-                )
-                # func_abs_pull[i] = ROOT.TF1(f"GausPull_abs_{i}", "gaus(0)", -3, 3)
-                # func_abs_pull[i].SetParameter(2, 1)
-
-                # Unfolded toy bin
-                mean = h_unfolded.GetBinContent(i + 1)
-                h_bin_toys_unfold[i] = ROOT.TH1D(
-                    f"Unfolded_toy_bin_{i}",
-                    f"Unfolded_toy_bin_{i}",
-                    100,
-                    (1 - 1.5 * rel_err) * mean,
-                    (1 + 1.5 * rel_err) * mean,
+            # Run pseudo-experiments
+            log.info(
+                "Running on \x1b[38;5;171m{0}\x1b[0m toys with \x1b[38;5;171m{1}\x1b[0m jobs...".format(
+                    self.nToys, self.njobs
                 )
-                h_bin_toys_unfold[i].SetDirectory(self.m_output)
-
-            # Allocating lists for toys
-            self.m_sx_abs = [0.0] * self.m_nbins
-            self.m_sx_rel = [0.0] * self.m_nbins
-            m_sxy_abs = [[0.0] * self.m_nbins for _ in range(self.m_nbins)]
-            m_sxy_rel = [[0.0] * self.m_nbins for _ in range(self.m_nbins)]
-            self.v_toys_abs = [[0.0] for _ in range(self.m_nbins)]
-            self.v_toys_rel = [[0.0] for _ in range(self.m_nbins)]
-
-            for i in range(self.m_nbins):  # TODO: this block can probably be removed
-                self.m_sx_abs[i] = 0
-                self.m_sx_rel[i] = 0
-                m_sxy_abs[i] = [0] * self.m_nbins
-                m_sxy_rel[i] = [0] * self.m_nbins
-                for j in range(self.m_nbins):
-                    m_sxy_abs[i][j] = 0
-                    m_sxy_rel[i][j] = 0
-                self.v_toys_abs[i] = [0] * self.nToys
-                self.v_toys_rel[i] = [0] * self.nToys
-
-            # Pseudo-experiments code ehre
-            log.info("Starting pseudo-experiments...")
-            ROOT.gDirectory.cd()
-
-            # Initialize smearing histograms
-            h_bkg_smeared = self.h_background.Clone()
-            h_response_smeared = self.h_response.Clone()
-            h_generated_smeared = self.h_generated.Clone()
-            h_signal_reco_smeared = self.h_signal_reco.Clone()
-
-            h_bkg_smeared.SetDirectory(0)
-            h_response_smeared.SetDirectory(0)
-            h_generated_smeared.SetDirectory(0)
-            h_signal_reco_smeared.SetDirectory(0)
-
-            h_acceptance_smeared = h_response_smeared.ProjectionX(
-                "h_acceptanceSmeared", 1, self.m_nbins
             )
-            h_acceptance_smeared.Divide(h_signal_reco_smeared)
-            h_acceptance_smeared.SetDirectory(0)
-
-            h_signal_truth_smeared = h_response_smeared.ProjectionY(
-                "h_signalTruthSmeared", 1, self.m_nbins
-            )
-            h_signal_truth_smeared.SetDirectory(0)
-
-            h_efficiency_smeared = h_signal_truth_smeared.Clone("h_efficiencySmeared")
-            h_efficiency_smeared.SetDirectory(0)
-            h_efficiency_smeared.Divide(h_generated_smeared)
-
-            # Add smearing
-            log.info("Running on \x1b[38;5;171m{}\x1b[0m toys...".format(self.nToys))
-            for i in tqdm.trange(0, self.nToys, ncols=100):
-                if self.method != "SimNeal" and self.method != "HybSam":
-                    self.unfolder.reset()
-
-                # Data smearing
-                h_data_smeared = self.h_data.Clone()
-                h_data_smeared.SetDirectory(0)
-                h_data_smeared.SetName(f"data_{i}")
-                run_toy(h_data_smeared, self.m_toy_type)
-                h_data_smeared_corrected = h_data_smeared.Clone()
-                h_data_smeared_corrected.SetDirectory(0)
-                h_data_smeared_corrected.SetName(f"data_corrected_{i}")
-
-                # Unfolder settings
-                self.unfolder.set_response_histogram(h_response_smeared)
-                if self.ignore_background == False:
-                    h_data_smeared_corrected.Add(h_bkg_smeared, -1)
-                h_data_smeared_corrected.Multiply(
-                    h_acceptance_smeared
-                )  # Nominal acceptance
-
-                # Unfold again
-                self.unfolder.set_data_histogram(h_data_smeared_corrected)
-                self.unfolder.do_unfold()
-
-                h_absXs_smeared = self.unfolder.h_unfolded.Clone()
-                h_absXs_smeared.SetDirectory(0)
-                h_absXs_smeared.Divide(h_efficiency_smeared)
-                h_absXs_smeared.Scale(1.0 / self.lumi)
-
-                integratedXs_smeared = h_absXs_smeared.Integral()
-                h_totalXs.Fill(integratedXs_smeared)
-                h_relXs_smeared = h_absXs_smeared.Clone()
-                h_relXs_smeared.SetDirectory(0)
-                h_relXs_smeared.Scale(1.0 / integratedXs_smeared)
-                h_unfolded = self.unfolder.h_unfolded.Clone()
-                divide_by_bin_width(h_relXs_smeared)
-                divide_by_bin_width(h_absXs_smeared)
-
-                for b in range(self.m_nbins):
-                    value_rel = h_relXs_smeared.GetBinContent(b + 1)
-                    h_bin_toys_rel[b].Fill(value_rel)
-                    self.v_toys_rel[b][i] = value_rel
-                    self.m_sx_rel[b] += value_rel
-
-                    value_abs = h_absXs_smeared.GetBinContent(b + 1)
-                    h_bin_toys_abs[b].Fill(value_abs)
-                    self.v_toys_abs[b][i] = value_abs
-                    self.m_sx_abs[b] += value_abs
-
-                    value_data = h_data_smeared.GetBinContent(b + 1)
-                    h_bin_toys_data[b].Fill(value_data)
-
-                    value_unfold = h_unfolded.GetBinContent(b + 1)
-                    h_bin_toys_unfold[b].Fill(value_unfold)
-
-                    for j in range(0, b + 1):
-                        value_rel_2 = h_relXs_smeared.GetBinContent(j + 1)
-                        m_sxy_rel[b][j] += value_rel * value_rel_2
-                        value_abs_2 = h_absXs_smeared.GetBinContent(j + 1)
-                        m_sxy_abs[b][j] += value_abs * value_abs_2
-
-            # Stat errors and fitting pulls
-            log.info("Setting stat errors and fitting pulls...")
+            if self.njobs == 1:
+                chunks = [self._run_toys_chunk(self, self.nToys)]
+            else:
+                chunks = self._run_toys_parallel(self)
+
+            # Merge the toys of each chunk, values are laid out as (rel, abs, data, unfold)
+            toys = np.concatenate([c["values"] for c in chunks], axis=2)
+            v_integratedXs = np.concatenate([c["integratedXs"] for c in chunks])
+            self.v_toys_rel = toys[0]
+            self.v_toys_abs = toys[1]
+
+            # Fill toys histograms
+            h_totalXs = self._fill_toys_histogram(self, "totalXs", v_integratedXs)
+            h_bin_toys_rel, h_bin_toys_abs, h_bin_toys_data, h_bin_toys_unfold = [
+                [
+                    self._fill_toys_histogram(self, f"{label}_toy_bin_{b}", toys[k, b])
+                    for b in range(self.m_nbins)
+                ]
+                for k, label in enumerate(["Rel", "Abs", "Data", "Unfolded"])
+            ]
+
+            # Stat errors and Gaussian fits
+            log.info("Setting stat errors and fitting toys...")
             for b in range(self.m_nbins):
-                self.m_sx_abs[b] /= self.nToys
-                self.m_sx_rel[b] /= self.nToys
-
-                for j in range(b + 1):
-                    m_sxy_rel[b][j] /= self.nToys
-                    m_sxy_abs[b][j] /= self.nToys
-
-                    if b != j:
-                        m_sxy_rel[j][b] = m_sxy_rel[b][j]
-                        m_sxy_abs[j][b] = m_sxy_abs[b][j]
-
-                # for toy in range(len(self.v_toys_abs[b])):
-                #     h_bin_toys_rel_pull[b].Fill(
-                #         (self.v_toys_rel[b][toy] - self.h_relXs.GetBinContent(b + 1))
-                #         / h_bin_toys_rel[b].GetRMS()
-                #     )
-                #     h_bin_toys_abs_pull[b].Fill(
-                #         (self.v_toys_abs[b][toy] - self.h_absXs.GetBinContent(b + 1))
-                #         / h_bin_toys_abs[b].GetRMS()
-                #     )
-
                 RMS_rel = h_bin_toys_rel[b].GetRMS()
                 self.h_relXs.SetBinError(b + 1, RMS_rel)
 
                 RMS_abs = h_bin_toys_abs[b].GetRMS()
                 self.h_absXs.SetBinError(b + 1, RMS_abs)
 
-                h_bin_toys_rel[b].Fit(func_rel[b].GetName(), "Q")
-                # h_bin_toys_rel_pull[b].Fit(func_rel_pull[b].GetName(), "Q")
-
-                # self.h_rel_pull_fit_mean.SetBinContent(
-                #     b + 1, func_rel_pull[b].GetParameter(1)
-                # )
-                # self.h_rel_pull_fit_mean.SetBinError(
-                #     b + 1, func_rel_pull[b].GetParError(1)
-                # )
-                # self.h_rel_pull_fit_error.SetBinContent(
-                #     b + 1, func_rel_pull[b].GetParameter(2)
-                # )
-                # self.h_rel_pull_fit_error.SetBinError(
-                #     b + 1, func_rel_pull[b].GetParError(2)
-                # )
-
-                h_bin_toys_abs[b].Fit(func_abs[b].GetName(), "Q")
-                # h_bin_toys_abs_pull[b].Fit(func_abs_pull[b].GetName(), "Q")
-
-                # self.h_abs_pull_fit_mean.SetBinContent(
-                #     b + 1, func_abs_pull[b].GetParameter(1)
-                # )
-                # self.h_abs_pull_fit_mean.SetBinError(
-                #     b + 1, func_abs_pull[b].GetParError(1)
-                # )
-                # self.h_abs_pull_fit_error.SetBinContent(
-                #     b + 1, func_abs_pull[b].GetParameter(2)
-                # )
-                # self.h_abs_pull_fit_error.SetBinError(
-                #     b + 1, func_abs_pull[b].GetParError(2)
-                # )
+                func_rel = ROOT.TF1(
+                    f"Gaus_rel_{b}",
+                    "gaus(0)",
+                    h_bin_toys_rel[b].GetXaxis().GetXmin(),
+                    h_bin_toys_rel[b].GetXaxis().GetXmax(),
+                )
+                h_bin_toys_rel[b].Fit(func_rel, "Q")
+
+                func_abs = ROOT.TF1(
+                    f"Gaus_abs_{b}",
+                    "gaus(0)",
+                    h_bin_toys_abs[b].GetXaxis().GetXmin(),
+                    h_bin_toys_abs[b].GetXaxis().GetXmax(),
+                )
+                h_bin_toys_abs[b].Fit(func_abs, "Q")
 
             # Build covariance and correlation matrices
             self._build_matrices(self)
-            self.m_totalXs_stat_err = h_totalXs.GetRMS()
+            self.m_totalXs_stat_err = v_integratedXs.std()
+
+    @staticmethod
+    def _fill_toys_histogram(self, name, values):
+        """
+        Create the histogram of the toys values of a bin, ranging over the toys sample.
+
+        Args:
+            name (str): name of the histogram.
+            values (numpy.array): contiguous array of the toys values.
+
+        Returns:
+            ROOT.TH1D: the filled histogram, attached to the output file.
+        """
+
+        # Range over the finite toys, padded so that the maximum doesn't fall into the
+        # overflow
+        finite = values[np.isfinite(values)]
+        low, high = (finite.min(), finite.max()) if finite.size else (0.0, 0.0)
+        pad = 0.05 * (high - low) if high > low else 0.05 * max(abs(low), 1.0)
+        histo = ROOT.TH1D(name, name, 100, low - pad, high + pad)
+        histo.SetDirectory(self.m_output)
+
+        # Bulk fill
+        histo.FillN(len(values), values, ROOT.nullptr)
+
+        return histo
+
+    @staticmethod
+    def _run_toys_chunk(self, ntoys, seed=None, show_progress=True):
+        """
+        Run a chunk of pseudo-experiments. The chunk is self-contained, so that it can be run in a forked worker process.
+
+        Args:
+            ntoys (int): number of toys to run.
+            seed (int, optional): seed for the random number generators. Default is None, which keeps their current state.
+            show_progress (bool, optional): whether to show the progress bar. Default is True.
+
+        Returns:
+            dict: toys values per bin, with shape (4, nbins, ntoys) for relative, absolute, data and unfolded values, and integrated cross-sections.
+        """
+
+        # Initial settings
+        ROOT.gDirectory.cd()
+        if seed is not None:
+            ROOT.gRandom.SetSeed(seed)
+        rng = np.random.default_rng(int(ROOT.gRandom.Integer(2**31 - 1)))
+
+        # Allocate toy histograms once, their bins are overwritten at each toy
+        h_data_smeared = self.h_data.Clone("DataSmeared")
+        h_data_smeared.SetDirectory(0)
+        h_data_smeared_corrected = self.h_data.Clone("DataSmearedCorrected")
+        h_data_smeared_corrected.SetDirectory(0)
+
+        # Bin buffers used by the fused corrections
+        nbins = self.m_nbins
+        data = get_contents_view(h_data_smeared)
+        data_sumw2 = get_sumw2_view(h_data_smeared)
+        corrected = get_contents_view(h_data_smeared_corrected)
+        corrected_sumw2 = get_sumw2_view(h_data_smeared_corrected)
+        acceptance = get_contents_view(self.h_acceptance)
+        acceptance_sumw2 = get_sumw2_view(self.h_acceptance)
+        if self.ignore_background == False:
+            bkg = get_contents_view(self.h_background)
+            bkg_sumw2 = get_sumw2_view(self.h_background)
+        else:
+            bkg, bkg_sumw2 = 0.0, 0.0
+        efficiency = self.lumi * get_contents_view(self.h_efficiency)[1 : nbins + 1]
+        inv_efficiency = np.divide(
+            1.0, efficiency, out=np.zeros(nbins), where=efficiency != 0
+        )
+        inv_widths = 1.0 / np.diff(get_bin_edges(self.unfolder.h_unfolded.GetXaxis()))
+
+        # Sample the smeared data of all the toys at once, for every reco bin
+        samples = sample_toys(self.h_data, self.m_toy_type, ntoys, rng)
+        nbins_reco = self.h_data.GetNbinsX()
+
+        # Allocating arrays for toys
+        values = np.zeros((4, nbins, ntoys))
+
+        # Add smearing
+        for i in tqdm.trange(0, ntoys, ncols=100, disable=not show_progress):
+            if self.method != "SimNeal" and self.method != "HybSam":
+                self.unfolder.reset()
+
+            # Data smearing
+            data[1 : nbins_reco + 1] = samples[i]
+
+            # Background subtraction and nominal acceptance correction, in one pass
+            data_minus_bkg = data - bkg
+            corrected[:] = data_minus_bkg * acceptance
+            corrected_sumw2[:] = (data_sumw2 + bkg_sumw2) * acceptance**2 + (
+                data_minus_bkg**2 * acceptance_sumw2
+            )
+
+            # Unfold again, reusing the response built by the nominal unfolding
+            self.unfolder.set_data_histogram(h_data_smeared_corrected)
+            self.unfolder.do_unfold(keep_response=True)
+
+            values[3, :, i] = get_contents_view(self.unfolder.h_unfolded)[1 : nbins + 1]
+
+        # Efficiency correction, luminosity and bin width scaling of all the toys at once
+        absXs = values[3] * inv_efficiency[:, np.newaxis]
+        integratedXs = absXs.sum(axis=0)
+        values[1] = absXs * inv_widths[:, np.newaxis]
+        values[0] = values[1] / integratedXs
+        values[2] = match_bins(samples, nbins).T
+
+        return {"values": values, "integratedXs": integratedXs}
+
+    @staticmethod
+    def _run_toys_parallel(self):
+        """
+        Run pseudo-experiments splitting them into chunks run by forked worker processes.
+        Each worker inherits a copy of the spectrum, including its own unfolder.
+
+        Returns:
+            list: the results of each chunk, see _run_toys_chunk().
+        """
+
+        global _forked_spectrum
+
+        # Split toys into chunks with independent seeds
+        njobs = min(self.njobs, self.nToys)
+        sizes = [len(c) for c in np.array_split(np.arange(self.nToys), njobs)]
+        seeds = [int(ROOT.gRandom.Integer(2**31 - 1)) + 1 for _ in sizes]
+
+        # Run the chunks
+        _forked_spectrum = self
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=njobs, mp_context=mp.get_context("fork")
+            ) as executor:
+                chunks = list(executor.map(_run_toys_worker, sizes, seeds))
+        finally:
+            _forked_spectrum = None
+
+        return chunks
 
     def compute_differential_cross_sections(self, error="kNoError"):
         """
@@ -937,10 +953,13 @@ class Spectrum:
             self.h_relXs_variance.SetDirectory(self.m_output)
             self.h_absXs_correlation.SetDirectory(self.m_output)
             self.h_relXs_correlation.SetDirectory(self.m_output)
-            # self.h_rel_pull_fit_error.SetDirectory(self.m_output)
-            # self.h_rel_pull_fit_mean.SetDirectory(self.m_output)
-            # self.h_abs_pull_fit_error.SetDirectory(self.m_output)
-            # self.h_abs_pull_fit_mean.SetDirectory(self.m_output)
+
+        # Saving an empty background when it is ignored, to keep the output layout
+        if self.ignore_background:
+            h_background = self.h_data.Clone("Background")
+            h_background.Reset()
+            h_background.SetStats(0)
+            h_background.SetDirectory(self.m_output)
 
         # Saving theory cross-sections
         h_theory_abs = self.get_theory_absolute_differential_xsec(self)
@@ -1,9 +1,29 @@
+import sys
 import ROOT
 from QUnfold import QUnfoldQUBO
 from QUnfold.utility import TH1_to_array, TH2_to_array, normalize_response
 
 # Personal modules
-from utils import transpose_matrix, array_to_TH1D
+from utils import transpose_matrix, array_to_TH1D, get_bin_edges, get_custom_logger
+
+# Logger settings
+log = get_custom_logger(__name__)
+
+# Whether RooUnfold has already been loaded
+_loaded_RooUnfold = False
+
+
+def _load_RooUnfold():
+    """
+    Load the RooUnfold library the first time it is needed, instead of at import time.
+    """
+
+    global _loaded_RooUnfold
+    if not _loaded_RooUnfold:
+        if ROOT.gSystem.Load("HEP_deps/RooUnfold/libRooUnfold.so") < 0:
+            log.error("RooUnfold not found!")
+            sys.exit(0)
+        _loaded_RooUnfold = True
 
 
 class Unfolder:
@@ -21,21 +41,24 @@ class Unfolder:
             parameter (int): the unfolding parameter.
         """
 
+        # RooUnfold is needed for the response, also by the QUnfold methods
+        _load_RooUnfold()
+
         # Input variables
         self.method = method
         self.error = error
         self.parameter = parameter
         self.nToys = nToys
 
-        # Histograms
-        self.h_data = ROOT.TH1D()
-        self.h_response = ROOT.TH2D()
-        self.h_unfolded = ROOT.TH1D()
+        # Histograms, allocated when first set or unfolded
+        self.h_data = None
+        self.h_response = None
+        self.h_unfolded = None
 
         # Other
         self.m_unfolder = None
         self.transpose_response = False
-        self.m_response = ROOT.RooUnfoldResponse()
+        self.m_response = None
 
         # Choose unfolding method
         if self.method == "Inversion":
@@ -58,6 +81,8 @@ class Unfolder:
             histo (TH1D): The input data histogram.
         """
 
+        if self.h_data is None:
+            self.h_data = ROOT.TH1D()
         histo.Copy(self.h_data)
         self.h_data.SetName("unf_Data")
         self.h_data.SetDirectory(0)
@@ -72,6 +97,8 @@ class Unfolder:
 
         """
 
+        if self.h_response is None:
+            self.h_response = ROOT.TH2D()
         histo.Copy(self.h_response)
         self.h_response.SetName("unf_Response")
         self.transpose_response = to_transpose
@@ -88,7 +115,7 @@ class Unfolder:
         """
 
         # Re-initialize the response if doesn't exist
-        if keep_response == False:
+        if keep_response == False or self.m_response is None:
             name = "{}_response".format(self.h_response.GetName())
             self.m_response = ROOT.RooUnfoldResponse(
                 self.h_response.ProjectionX(),
@@ -125,10 +152,7 @@ class Unfolder:
                     )
                 elif self.method == "HybSam":
                     h_unfolded_array, _, _, _ = self.m_unfolder.solve_hybrid_sampler()
-                binning = [
-                    self.h_data.GetXaxis().GetBinLowEdge(bin)
-                    for bin in range(1, self.h_data.GetNbinsX() + 2)
-                ]
+                binning = get_bin_edges(self.h_data.GetXaxis())
                 self.h_unfolded = array_to_TH1D(
                     bin_contents=h_unfolded_array[1:-1],
                     binning=binning,
@@ -148,8 +172,9 @@ class Unfolder:
         Reset the Unfolder object and associated histograms.
         """
 
-        self.h_response.SetDirectory(0)
+        if self.h_response is not None:
+            self.h_response.SetDirectory(0)
         self.m_unfolder.Reset()
-        if self.method == "kBayes":
-            self.unfolder.SetSmoothing(0)
+        if self.method == "Bayes":
+            self.m_unfolder.SetSmoothing(0)
         self.m_unfolder.SetVerbose(0)
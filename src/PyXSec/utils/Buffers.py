@@ -0,0 +1,88 @@
+import ROOT
+import numpy as np
+
+
+def _get_dtype(histo):
+    """
+    Get the NumPy dtype matching the storage of a ROOT histogram.
+
+    Args:
+        histo (ROOT.TH1): input histogram.
+
+    Returns:
+        numpy.dtype: the dtype of the histogram bin contents.
+    """
+
+    if isinstance(histo, ROOT.TArrayD):
+        return np.float64
+    elif isinstance(histo, ROOT.TArrayF):
+        return np.float32
+    raise TypeError("Unsupported histogram type: {}".format(histo.ClassName()))
+
+
+def get_contents_view(histo):
+    """
+    Get a zero-copy NumPy view over the bin contents of a ROOT histogram.
+    The view includes underflow and overflow bins, following the ROOT global bin numbering.
+
+    Args:
+        histo (ROOT.TH1/TH2): input histogram.
+
+    Returns:
+        numpy.array: flat view of the bin contents, of size histo.GetNcells().
+    """
+
+    return np.frombuffer(
+        histo.GetArray(), dtype=_get_dtype(histo), count=histo.GetNcells()
+    )
+
+
+def get_sumw2_view(histo):
+    """
+    Get a zero-copy NumPy view over the sum of squared weights of a ROOT histogram.
+    The sum of squared weights structure is created if the histogram doesn't have it yet.
+
+    Args:
+        histo (ROOT.TH1/TH2): input histogram.
+
+    Returns:
+        numpy.array: flat view of the squared bin errors, of size histo.GetNcells().
+    """
+
+    if histo.GetSumw2N() == 0:
+        histo.Sumw2()
+    return np.frombuffer(
+        histo.GetSumw2().GetArray(), dtype=np.float64, count=histo.GetNcells()
+    )
+
+
+def copy_bins(source, target):
+    """
+    Copy bin contents and squared errors between two histograms with the same binning, without allocating new objects.
+
+    Args:
+        source (ROOT.TH1/TH2): histogram to copy bins from.
+        target (ROOT.TH1/TH2): histogram to copy bins into.
+    """
+
+    np.copyto(get_contents_view(target), get_contents_view(source), casting="unsafe")
+    np.copyto(get_sumw2_view(target), get_sumw2_view(source))
+
+
+def get_bin_edges(axis):
+    """
+    Get the bin edges of a ROOT axis as a NumPy array.
+
+    Args:
+        axis (ROOT.TAxis): input axis.
+
+    Returns:
+        numpy.array: the axis.GetNbins() + 1 bin edges.
+    """
+
+    xbins = axis.GetXbins()
+    if xbins.GetSize() > 0:
+        return np.frombuffer(
+            xbins.GetArray(), dtype=np.float64, count=xbins.GetSize()
+        ).copy()
+    return np.linspace(axis.GetXmin(), axis.GetXmax(), axis.GetNbins() + 1)
@@ -11,10 +11,10 @@ def try_parse_str(var, root, key, elem):
     Returns:
         str: The parsed string or the default value if parsing fails.
     """
-    try:
-        return root.find(key).attrib[elem]
-    except:
+    node = root.find(key)
+    if node is None:
         return var
+    return node.attrib.get(elem, var)
 
 
 def try_parse_int(var, root, key, elem):
@@ -30,9 +30,12 @@ def try_parse_int(var, root, key, elem):
     Returns:
         int: The parsed integer or the default value if parsing fails.
     """
+    value = try_parse_str(None, root, key, elem)
+    if value is None:
+        return var
     try:
-        return int(root.find(key).attrib[elem])
-    except:
+        return int(value)
+    except ValueError:
         return var
 
 
@@ -49,7 +52,10 @@ def try_parse_float(var, root, key, elem):
     Returns:
         float: The parsed float or the default value if parsing fails.
     """
+    value = try_parse_str(None, root, key, elem)
+    if value is None:
+        return var
     try:
-        return float(root.find(key).attrib[elem])
-    except:
+        return float(value)
+    except ValueError:
         return var
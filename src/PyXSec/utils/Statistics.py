@@ -1,5 +1,6 @@
 import ROOT
-from array import array
+import numpy as np
+from .Buffers import get_contents_view, get_sumw2_view, get_bin_edges
 
 
 def transpose_matrix(h2):
@@ -10,19 +11,19 @@ def transpose_matrix(h2):
         h2 (ROOT.TH2): The bidimensional histogram to transpose.
     """
 
-    hTemp = h2.Clone()
-    hTemp.SetDirectory(0)
+    # Transpose contents and squared errors in place, the global bins of a TH2 are laid out as (y, x)
+    nx, ny = h2.GetNbinsX(), h2.GetNbinsY()
+    for view in [get_contents_view(h2), get_sumw2_view(h2)]:
+        bins = view.reshape(ny + 2, nx + 2)[1 : ny + 1, 1 : nx + 1]
+        bins[...] = bins.T.copy()
 
-    for i in range(1, h2.GetNbinsX() + 1):
-        for j in range(1, h2.GetNbinsY() + 1):
-            hTemp.SetBinContent(j, i, h2.GetBinContent(i, j))
-            hTemp.SetBinError(j, i, h2.GetBinError(i, j))
+    # Swap axes titles
+    x_title = h2.GetXaxis().GetTitle()
+    h2.GetXaxis().SetTitle(h2.GetYaxis().GetTitle())
+    h2.GetYaxis().SetTitle(x_title)
 
-    hTemp.GetXaxis().SetTitle(h2.GetYaxis().GetTitle())
-    hTemp.GetYaxis().SetTitle(h2.GetXaxis().GetTitle())
-
-    h2.Reset()
-    h2.Add(hTemp)
+    # The buffers were written directly, recompute the statistics from the bins
+    h2.ResetStats()
 
 
 def divide_by_bin_width(histo):
@@ -33,42 +34,62 @@ def divide_by_bin_width(histo):
         histo (ROOT.TH1/TH2): input histogram for bin width division.
     """
 
-    if isinstance(histo, ROOT.TH1):
-        for i in range(1, histo.GetNbinsX() + 1):
-            width = histo.GetBinWidth(i)
-            content = histo.GetBinContent(i)
-            error = histo.GetBinError(i)
-            histo.SetBinContent(i, content / width)
-            histo.SetBinError(i, error / width)
-    elif isinstance(histo, ROOT.TH2):
-        for i in range(1, histo.GetNbinsX() + 1):
-            widthX = histo.GetXaxis().GetBinWidth(i)
-            for j in range(1, histo.GetNbinsY() + 1):
-                widthY = histo.GetYaxis().GetBinWidth(j)
-                width = widthX * widthY
-                content = histo.GetBinContent(i, j)
-                error = histo.GetBinError(i, j)
-                histo.SetBinContent(i, j, content / width)
-                histo.SetBinError(i, j, error / width)
-
-
-def run_toy(histo, toy_type):
+    # Bin widths, underflow and overflow bins are left untouched
+    widths = np.ones(histo.GetNbinsX() + 2)
+    widths[1:-1] = np.diff(get_bin_edges(histo.GetXaxis()))
+    if histo.GetDimension() == 2:
+        widthsY = np.ones(histo.GetNbinsY() + 2)
+        widthsY[1:-1] = np.diff(get_bin_edges(histo.GetYaxis()))
+        widths = np.outer(widthsY, widths).ravel()
+
+    # Divide contents and squared errors
+    sumw2 = get_sumw2_view(histo)
+    contents = get_contents_view(histo)
+    contents /= widths
+    sumw2 /= widths**2
+
+    # The buffers were written directly, recompute the statistics from the bins
+    histo.ResetStats()
+
+
+def sample_toys(histo, toy_type, ntoys, rng=None):
+    """
+    Sample the bin contents of a batch of toy experiments from a ROOT histogram.
+
+    Args:
+        histo (ROOT.TH1): Input histogram.
+        toy_type (str): Type of toy experiment. Use "Poisson" for Poisson distribution or any other string for Gaussian smearing.
+        ntoys (int): Number of toy experiments.
+        rng (numpy.random.Generator, optional): Random number generator. Default is None, which uses the global NumPy one.
+
+    Returns:
+        numpy.array: the smeared bin contents, with shape (ntoys, nbins).
+    """
+
+    if rng is None:
+        rng = np.random
+    nbins = histo.GetNbinsX()
+    mean = get_contents_view(histo)[1 : nbins + 1].astype(np.float64)
+    if toy_type == "Poisson":
+        return rng.poisson(np.clip(mean, 0, None), size=(ntoys, nbins)).astype(
+            np.float64
+        )
+    sigma = np.sqrt(get_sumw2_view(histo)[1 : nbins + 1])
+    return rng.normal(mean, sigma, size=(ntoys, nbins))
+
+
+def run_toy(histo, toy_type, rng=None):
     """
     Run a toy experiment on a ROOT histogram.
 
     Args:
         histo (ROOT.TH1): Input histogram.
         toy_type (str): Type of toy experiment. Use "Poisson" for Poisson distribution or any other string for Gaussian smearing.
+        rng (numpy.random.Generator, optional): Random number generator. Default is None, which uses the global NumPy one.
     """
 
     nbins = histo.GetNbinsX()
-    for i in range(1, nbins + 1):
-        mean = histo.GetBinContent(i)
-        if toy_type == "Poisson":
-            smear = ROOT.gRandom.PoissonD(mean)
-        else:
-            smear = ROOT.gRandom.Gaus(mean, histo.GetBinError(i))
-        histo.SetBinContent(i, smear)
+    get_contents_view(histo)[1 : nbins + 1] = sample_toys(histo, toy_type, 1, rng)[0]
 
 
 def array_to_TH1D(bin_contents, binning, name, x_axis_name, y_axis_name):
@@ -78,7 +99,7 @@ def array_to_TH1D(bin_contents, binning, name, x_axis_name, y_axis_name):
 
     Args:
         bin_contents (numpy.array): The NumPy array representing bin contents.
-        binning (list): The binning of the histogram.
+        binning (list/numpy.array): The binning of the histogram.
         name (str): Name of the ROOT.TH1D histogram. Default is "hist".
         x_axis_name (str): Title for the x-axis.
         y_axis_name (str, optional): Title for the y-axis.
@@ -87,12 +108,57 @@ def array_to_TH1D(bin_contents, binning, name, x_axis_name, y_axis_name):
         ROOT.TH1D: The converted ROOT.TH1F histogram.
     """
 
+    binning = np.ascontiguousarray(binning, dtype=np.float64)
     bins = len(binning) - 1
-    histo = ROOT.TH1D(name, name, bins, array("d", binning))
+    histo = ROOT.TH1D(name, name, bins, binning)
     histo.GetXaxis().SetTitle(x_axis_name)
     histo.GetYaxis().SetTitle(y_axis_name)
-    for i in range(bins):
-        histo.SetBinContent(i + 1, bin_contents[i])
-        histo.SetBinError(i + 1, bin_contents[i] ** 0.5)
+
+    # Fill contents and squared errors through the bin buffers
+    get_contents_view(histo)[1 : bins + 1] = bin_contents
+    get_sumw2_view(histo)[1 : bins + 1] = bin_contents
+    histo.SetEntries(bins)
 
     return histo
+
+
+def compute_covariance(v_toys):
+    """
+    Compute mean, covariance and correlation of the bins of a set of pseudo-experiments.
+    Covariance: cov(i,j) = 1/N * sum_n (data_i - mean_i) * (data_j - mean_j)
+
+    Args:
+        v_toys (numpy.array): toys values, with shape (nbins, ntoys).
+
+    Returns:
+        tuple: mean (nbins), covariance (nbins, nbins) and correlation (nbins, nbins) arrays.
+    """
+
+    v_toys = np.asarray(v_toys, dtype=np.float64)
+    mean = v_toys.mean(axis=1)
+    residuals = v_toys - mean[:, np.newaxis]
+    covariance = residuals @ residuals.T / v_toys.shape[1]
+    std = np.sqrt(np.diag(covariance))
+    correlation = covariance / np.outer(std, std)
+
+    return mean, covariance, correlation
+
+
+def match_bins(values, nbins):
+    """
+    Match the last axis of an array of bin values to a different number of bins.
+    Extra bins are dropped and missing ones are set to zero, like reading them out of a histogram range.
+
+    Args:
+        values (numpy.array): bin values, with bins along the last axis.
+        nbins (int): number of bins to match.
+
+    Returns:
+        numpy.array: the bin values, with nbins bins along the last axis.
+    """
+
+    matched = np.zeros(values.shape[:-1] + (nbins,))
+    k = min(nbins, values.shape[-1])
+    matched[..., :k] = values[..., :k]
+
+    return matched
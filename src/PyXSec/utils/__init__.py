@@ -1,3 +1,12 @@
 from .CustomLogger import get_custom_logger
 from .Generic import try_parse_float, try_parse_str, try_parse_int
-from .Statistics import transpose_matrix, divide_by_bin_width, run_toy, array_to_TH1D
+from .Statistics import (
+    transpose_matrix,
+    divide_by_bin_width,
+    run_toy,
+    sample_toys,
+    array_to_TH1D,
+    compute_covariance,
+    match_bins,
+)
+from .Buffers import get_contents_view, get_sumw2_view, copy_bins, get_bin_edges
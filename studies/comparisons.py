@@ -13,7 +13,6 @@ import os
 import uproot
 import matplotlib.pyplot as plt
 import numpy as np
-import math
 
 # My modules
 from utility import compute_chi2, compute_triangular_discriminator, compute_chi2_nocov
@@ -22,6 +21,12 @@ from utility import compute_chi2, compute_triangular_discriminator, compute_chi2
 # TODO: scrivere i generatori
 
 
+def format_significant(value, digits=3):
+    return np.format_float_positional(
+        value, precision=digits, fractional=False, trim="-"
+    )
+
+
 def plot_hist(qunfold, roounfold, theory, cov_qunfold, cov_roounfold):
     # Divide into subplots
     fig = plt.figure()
@@ -30,33 +35,30 @@ def plot_hist(qunfold, roounfold, theory, cov_qunfold, cov_roounfold):
     ax2 = fig.add_subplot(gs[1], sharex=ax1)
     marker_size = 3.5
 
-    # Plot QUnfold data
-    qunfold_val = qunfold.to_numpy()[0]
+    # Read the histograms contents once
+    qunfold_val, binning = qunfold.to_numpy()
     qunfold_err = qunfold.variances()
-    binning = qunfold.to_numpy()[1]
+    roounfold_val = roounfold.to_numpy()[0]
+    roounfold_err = roounfold.variances()
+    theory_val = theory.to_numpy()[0]
+
+    # Plot QUnfold data
     bin_midpoints = 0.5 * (binning[:-1] + binning[1:])
 
     # Compute chi2 with covariance matrix
     if args.covariance == "yes":
-        chi2_val = compute_chi2(
-            qunfold.to_numpy()[0], theory.to_numpy()[0], cov_qunfold.to_numpy()[0]
-        )
-        expo_chi2 = math.floor(math.log10(abs(chi2_val))) - 2
-        chi2_qunfold = round(chi2_val, -expo_chi2)
+        chi2_val = compute_chi2(qunfold_val, theory_val, cov_qunfold)
+        chi2_qunfold = format_significant(chi2_val)
 
     # Compute chi2 without covariance matrix
-    chi2_val = compute_chi2_nocov(qunfold.to_numpy()[0], theory.to_numpy()[0])
-    expo_chi2_val = math.floor(math.log10(abs(chi2_val))) - 2
-    chi2_nocov_qunfold = round(chi2_val, -expo_chi2_val)
+    chi2_val = compute_chi2_nocov(qunfold_val, theory_val)
+    chi2_nocov_qunfold = format_significant(chi2_val)
 
     # Compute Triangular Discriminator metrics
     triangular_discriminator_val = compute_triangular_discriminator(
-        qunfold.to_numpy()[0], theory.to_numpy()[0]
-    )
-    expo_triangular_discriminator = math.floor(math.log10(abs(triangular_discriminator_val))) - 2
-    triangular_discriminator_qunfold = round(
-        triangular_discriminator_val, -expo_triangular_discriminator
+        qunfold_val, theory_val
     )
+    triangular_discriminator_qunfold = format_significant(triangular_discriminator_val)
 
     label = (
         rf"QUnfold | $\chi^2 = {chi2_nocov_qunfold}$"
@@ -83,30 +85,21 @@ def plot_hist(qunfold, roounfold, theory, cov_qunfold, cov_roounfold):
     )
 
     # Plot RooUnfold data
-    roounfold_val = roounfold.to_numpy()[0]
-    roounfold_err = roounfold.variances()
-    binning = roounfold.to_numpy()[1]
-
     # Compute chi2 with covariance matrix
     if args.covariance == "yes":
-        chi2_val = compute_chi2(
-            roounfold.to_numpy()[0], theory.to_numpy()[0], cov_roounfold.to_numpy()[0]
-        )
-        expo = math.floor(math.log10(abs(chi2_val))) - 2
-        chi2_roounfold = round(chi2_val, -expo)
+        chi2_val = compute_chi2(roounfold_val, theory_val, cov_roounfold)
+        chi2_roounfold = format_significant(chi2_val)
 
     # Compute chi2 without covariance matrix
-    chi2_val = compute_chi2_nocov(roounfold.to_numpy()[0], theory.to_numpy()[0])
-    expo_chi2_val = math.floor(math.log10(abs(chi2_val))) - 2
-    chi2_nocov_roounfold = round(chi2_val, -expo_chi2_val)
+    chi2_val = compute_chi2_nocov(roounfold_val, theory_val)
+    chi2_nocov_roounfold = format_significant(chi2_val)
 
     # Compute Triangular Discriminator metrics
     triangular_discriminator_val = compute_triangular_discriminator(
-        roounfold.to_numpy()[0], theory.to_numpy()[0]
+        roounfold_val, theory_val
     )
-    expo_triangular_discriminator = math.floor(math.log10(abs(triangular_discriminator_val))) - 2
-    triangular_discriminator_roounfold = round(
-        triangular_discriminator_val, -expo_triangular_discriminator
+    triangular_discriminator_roounfold = format_significant(
+        triangular_discriminator_val
     )
 
     label = (
@@ -134,19 +127,19 @@ def plot_hist(qunfold, roounfold, theory, cov_qunfold, cov_roounfold):
     )
 
     # Plot theory data
-    theory_val = theory.to_numpy()[0]
-    steps = np.append(theory_val, [theory_val[-1]])
+    steps = np.concatenate([theory_val, theory_val[-1:]])
     ax1.step(binning, steps, where="post")
     ax1.fill_between(binning, steps, step="post", alpha=0.3, label="Truth")
 
-    # Plot ratio theory / truth
+    # Plot ratio theory / truth, dividing by the truth once for all the ratios
+    inv_theory_val = 1.0 / theory_val
     ax2.step(binning, steps / steps, where="post", color="tab:blue")
 
     # Plot ratio QUnfold to truth
     ax2.errorbar(
-        y=qunfold_val / theory_val,
+        y=qunfold_val * inv_theory_val,
         x=bin_midpoints,
-        yerr=qunfold_err / theory_val,
+        yerr=qunfold_err * inv_theory_val,
         ms=marker_size,
         fmt="o",
         color="g",
@@ -155,9 +148,9 @@ def plot_hist(qunfold, roounfold, theory, cov_qunfold, cov_roounfold):
 
     # Plot ratio RooUnfold to truth
     ax2.errorbar(
-        y=roounfold_val / theory_val,
+        y=roounfold_val * inv_theory_val,
         x=bin_midpoints,
-        yerr=roounfold_err / theory_val,
+        yerr=roounfold_err * inv_theory_val,
         ms=marker_size,
         fmt="v",
         color="r",
@@ -209,16 +202,16 @@ def main():
     # Read QUnfold information
     file_QUnfold = uproot.open(args.qunfold)
     abs_Xs_QUnfold = file_QUnfold["AbsoluteDiffXs"]
-    abs_covariance_QUnfold = []
+    abs_covariance_QUnfold = None
     if args.covariance == "yes":
-        abs_covariance_QUnfold = file_QUnfold["Covariance_abs"]
+        abs_covariance_QUnfold = file_QUnfold["Covariance_abs"].to_numpy()[0]
 
     # Read RooUnfold information
     file_RooUnfold = uproot.open(args.roounfold)
     abs_Xs_RooUnfold = file_RooUnfold["AbsoluteDiffXs"]
-    abs_covariance_RooUnfold = []
+    abs_covariance_RooUnfold = None
     if args.covariance == "yes":
-        abs_covariance_RooUnfold = file_RooUnfold["Covariance_abs"]
+        abs_covariance_RooUnfold = file_RooUnfold["Covariance_abs"].to_numpy()[0]
 
     # Read theory information
     file_theory = uproot.open(args.theory)
@@ -0,0 +1,75 @@
+import ROOT
+from array import array
+from utils import get_contents_view, get_sumw2_view, copy_bins, get_bin_edges
+
+
+def test_get_contents_view():
+    """
+    Test the get_contents_view function for reading and writing TH1 bin contents.
+    """
+
+    # Create the histogram
+    histo = ROOT.TH1D("test_contents_view", "", 4, 0, 4)
+    for i in range(1, 5):
+        histo.SetBinContent(i, i * 10.0)
+
+    # Check the view includes underflow and overflow bins
+    view = get_contents_view(histo)
+    assert len(view) == histo.GetNcells()
+    for i in range(1, 5):
+        assert view[i] == histo.GetBinContent(i)
+
+    # Check writing through the view modifies the histogram
+    view[2] = 42.0
+    assert histo.GetBinContent(2) == 42.0
+
+
+def test_get_sumw2_view():
+    """
+    Test the get_sumw2_view function for reading TH1 squared bin errors.
+    """
+
+    # Create the histogram
+    histo = ROOT.TH1D("test_sumw2_view", "", 4, 0, 4)
+    for i in range(1, 5):
+        histo.SetBinContent(i, i * 10.0)
+        histo.SetBinError(i, i * 0.5)
+
+    # Check the squared errors
+    view = get_sumw2_view(histo)
+    for i in range(1, 5):
+        assert view[i] == (i * 0.5) ** 2
+
+
+def test_copy_bins():
+    """
+    Test the copy_bins function for copying bin contents and errors between histograms.
+    """
+
+    # Create the histograms
+    source = ROOT.TH1D("test_copy_source", "", 4, 0, 4)
+    target = ROOT.TH1D("test_copy_target", "", 4, 0, 4)
+    for i in range(1, 5):
+        source.SetBinContent(i, i * 10.0)
+        source.SetBinError(i, i * 0.5)
+
+    # Check the copy
+    copy_bins(source, target)
+    for i in range(1, 5):
+        assert target.GetBinContent(i) == source.GetBinContent(i)
+        assert target.GetBinError(i) == source.GetBinError(i)
+
+
+def test_get_bin_edges():
+    """
+    Test the get_bin_edges function for uniform and variable binnings.
+    """
+
+    # Uniform binning
+    histo = ROOT.TH1D("test_edges_uniform", "", 4, 0, 2)
+    assert list(get_bin_edges(histo.GetXaxis())) == [0.0, 0.5, 1.0, 1.5, 2.0]
+
+    # Variable binning
+    binning = [0.0, 1.0, 3.0, 7.0]
+    histo = ROOT.TH1D("test_edges_variable", "", 3, array("d", binning))
+    assert list(get_bin_edges(histo.GetXaxis())) == binning
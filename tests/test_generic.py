@@ -19,6 +19,12 @@ def test_try_parse_str():
     result = try_parse_str("default", root, "key", "elem")
     assert result == "default"
 
+    # Test when the element is missing, return default value
+    xml_string = "<root/>"
+    root = ET.fromstring(xml_string)
+    result = try_parse_str("default", root, "key", "elem")
+    assert result == "default"
+
 
 def test_try_parse_int():
     """
@@ -1,6 +1,15 @@
 from hypothesis import given, strategies as st
 import ROOT
-from utils import transpose_matrix, divide_by_bin_width, array_to_TH1D
+import numpy as np
+from utils import (
+    transpose_matrix,
+    divide_by_bin_width,
+    array_to_TH1D,
+    compute_covariance,
+    run_toy,
+    sample_toys,
+    match_bins,
+)
 
 
 @given(st.integers(min_value=1, max_value=10))
@@ -99,3 +108,106 @@ def test_array_to_TH1D():
     for i in range(len(bin_contents)):
         assert histogram.GetBinContent(i + 1) == bin_contents[i]
         assert histogram.GetBinError(i + 1) == bin_contents[i] ** 0.5
+
+
+@given(st.integers(min_value=1, max_value=10), st.integers(min_value=2, max_value=50))
+def test_compute_covariance(num_bins, num_toys):
+    """
+    Test the compute_covariance function against the explicit covariance definition.
+
+    Args:
+        num_bins (int): Number of bins of the toys.
+        num_toys (int): Number of toys.
+    """
+
+    # Create the toys
+    v_toys = np.random.default_rng(num_bins * num_toys).normal(
+        size=(num_bins, num_toys)
+    )
+    mean, covariance, correlation = compute_covariance(v_toys)
+
+    # Check the results
+    for i in range(num_bins):
+        assert np.isclose(mean[i], sum(v_toys[i]) / num_toys)
+        for j in range(num_bins):
+            cov = (
+                sum(
+                    (v_toys[i][n] - mean[i]) * (v_toys[j][n] - mean[j])
+                    for n in range(num_toys)
+                )
+                / num_toys
+            )
+            assert np.isclose(covariance[i][j], cov)
+            assert np.isclose(
+                correlation[i][j],
+                cov / np.sqrt(covariance[i][i] * covariance[j][j]),
+            )
+
+
+@given(st.integers(min_value=1, max_value=10), st.integers(min_value=1, max_value=20))
+def test_sample_toys(num_bins, num_toys):
+    """
+    Test the sample_toys function for Poisson and Gaussian toys.
+
+    Args:
+        num_bins (int): Number of bins of the histogram.
+        num_toys (int): Number of toys.
+    """
+
+    # Create the histogram
+    histo = ROOT.TH1D("histo_sample_toys", "", num_bins, 0, num_bins)
+    for i in range(1, num_bins + 1):
+        histo.SetBinContent(i, i * 10.0)
+        histo.SetBinError(i, 0.0)
+
+    # Poisson toys are non-negative integers
+    rng = np.random.default_rng(num_bins)
+    samples = sample_toys(histo, "Poisson", num_toys, rng)
+    assert samples.shape == (num_toys, num_bins)
+    assert np.all(samples >= 0)
+    assert np.all(samples == np.round(samples))
+
+    # Gaussian toys with null errors are the bin contents
+    samples = sample_toys(histo, "Gauss", num_toys, rng)
+    for i in range(num_bins):
+        assert np.all(samples[:, i] == (i + 1) * 10.0)
+
+
+def test_run_toy():
+    """
+    Test the run_toy function smears only the bin contents of the histogram.
+    """
+
+    # Create the histogram
+    histo = ROOT.TH1D("histo_run_toy", "", 4, 0, 4)
+    for i in range(1, 5):
+        histo.SetBinContent(i, 1000.0)
+        histo.SetBinError(i, 1.0)
+
+    # Run the toy
+    run_toy(histo, "Gauss", np.random.default_rng(0))
+    for i in range(1, 5):
+        assert histo.GetBinContent(i) != 1000.0
+        assert abs(histo.GetBinContent(i) - 1000.0) < 10.0
+        assert histo.GetBinError(i) == 1.0
+
+
+@given(st.integers(min_value=1, max_value=10), st.integers(min_value=1, max_value=10))
+def test_match_bins(num_bins, num_target_bins):
+    """
+    Test the match_bins function for both fewer and more target bins.
+
+    Args:
+        num_bins (int): Number of bins of the input values.
+        num_target_bins (int): Number of bins to match.
+    """
+
+    # Create the values, with 3 toys of num_bins bins
+    values = np.arange(1, 3 * num_bins + 1, dtype=np.float64).reshape(3, num_bins)
+
+    # Check common bins are kept and missing ones are zero
+    matched = match_bins(values, num_target_bins)
+    k = min(num_bins, num_target_bins)
+    assert matched.shape == (3, num_target_bins)
+    assert np.all(matched[:, :k] == values[:, :k])
+    assert np.all(matched[:, k:] == 0.0)